@@ -6,17 +6,53 @@
 import os
 import chromadb
 from pathlib import Path
-import hashlib
+from itertools import accumulate
+from concurrent.futures import ThreadPoolExecutor
+
+# 每次collection.add写入的chunk数
+BATCH_SIZE = 256
+# 并行读取文件的线程数
+MAX_WORKERS = 16
 
 def chunk_text(text: str, chunk_size: int = 300, overlap: int = 50):
     """文本分块"""
     words = text.split()
-    chunks = []
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = ' '.join(words[i:i + chunk_size])
-        if chunk.strip():
-            chunks.append(chunk)
-    return chunks
+    if not words:
+        return []
+    
+    # 空白规整只做一次，之后按字符偏移切片，避免每个窗口重新join
+    normalized = ' '.join(words)
+    # offsets[i] = 第i个词在normalized中的起始位置（末尾哨兵对应len+1）
+    offsets = [0, *accumulate(len(w) + 1 for w in words)]
+    
+    n = len(words)
+    return [
+        normalized[offsets[i]:offsets[min(i + chunk_size, n)] - 1]
+        for i in range(0, n, chunk_size - overlap)
+    ]
+
+def process_file(file_path: Path, source: str):
+    """读取并分块单个文件，返回 (chunks, ids, metadatas)；空文件返回None
+    
+    source: 文件相对docs_dir的路径，用作chunk ID前缀和'source'元数据
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    if not content.strip():
+        return None
+    
+    # 分块
+    chunks = chunk_text(content, chunk_size=300, overlap=50)
+    
+    # 为每个chunk生成唯一ID（用相对路径，子目录下的同名文件不会冲突）
+    ids = [f"{source}_{idx}" for idx in range(len(chunks))]
+    metas = [
+        {'source': source, 'chunk_idx': idx}
+        for idx in range(len(chunks))
+    ]
+    
+    return chunks, ids, metas
 
 def build_database(docs_dir: str = "../data/raw_docs", 
                    db_path: str = "../data/vector_db"):
@@ -48,11 +84,12 @@ def build_database(docs_dir: str = "../data/raw_docs",
         docs_path.mkdir(parents=True, exist_ok=True)
         return
     
-    # 支持的文件格式
-    supported_extensions = ['.txt', '.md']
-    all_files = []
-    for ext in supported_extensions:
-        all_files.extend(docs_path.glob(f'**/*{ext}'))
+    # 支持的文件格式（单次遍历目录树，按后缀过滤）
+    supported_extensions = {'.txt', '.md'}
+    all_files = [
+        p for p in docs_path.rglob('*')
+        if p.suffix in supported_extensions and p.is_file()
+    ]
     
     if not all_files:
         print(f"⚠️  No documents found in {docs_dir}")
@@ -61,41 +98,70 @@ def build_database(docs_dir: str = "../data/raw_docs",
     
     print(f"📄 Found {len(all_files)} documents")
     
-    total_chunks = 0
+    all_chunks = []
+    all_ids = []
+    all_metas = []
     
-    for file_path in all_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if not content.strip():
+    # 每个文件的处理结果先缓存，建库完成后一次性输出，避免逐文件刷新stdout
+    read_errors = []
+    file_chunks = {}  # source -> chunk数
+    
+    # 并行读取+分块，重叠小文件的open/read延迟
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        sources = [fp.relative_to(docs_path).as_posix() for fp in all_files]
+        futures = [
+            executor.submit(process_file, fp, source)
+            for fp, source in zip(all_files, sources)
+        ]
+        
+        for source, future in zip(sources, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                read_errors.append(f"  ❌ Error processing {source}: {e}")
                 continue
             
-            # 分块
-            chunks = chunk_text(content, chunk_size=300, overlap=50)
-            
-            # 为每个chunk生成唯一ID
-            for idx, chunk in enumerate(chunks):
-                chunk_id = hashlib.md5(
-                    f"{file_path.name}_{idx}".encode()
-                ).hexdigest()
-                
-                collection.add(
-                    documents=[chunk],
-                    ids=[chunk_id],
-                    metadatas=[{
-                        'source': file_path.name,
-                        'chunk_idx': idx
-                    }]
-                )
-                total_chunks += 1
+            if result is None:
+                continue
             
-            print(f"  ✅ {file_path.name}: {len(chunks)} chunks")
+            chunks, ids, metas = result
+            all_chunks.extend(chunks)
+            all_ids.extend(ids)
+            all_metas.extend(metas)
             
+            file_chunks[source] = len(chunks)
+    
+    # 批量写入（每批一次embedding前向 + 一次写库）
+    # 单批失败只跳过该批，不中断整个构建
+    total_chunks = 0
+    failed_sources = set()
+    for batch_idx, start in enumerate(range(0, len(all_chunks), BATCH_SIZE)):
+        end = start + BATCH_SIZE
+        try:
+            collection.add(
+                documents=all_chunks[start:end],
+                ids=all_ids[start:end],
+                metadatas=all_metas[start:end]
+            )
+            total_chunks += len(all_chunks[start:end])
         except Exception as e:
-            print(f"  ❌ Error processing {file_path.name}: {e}")
+            print(f"  ❌ Error indexing batch {batch_idx} "
+                  f"(chunks {start}-{min(end, len(all_chunks)) - 1}): {e}")
+            failed_sources.update(m['source'] for m in all_metas[start:end])
+    
+    # 写库完成后再输出逐文件结果，失败批次涉及的文件单独标出
+    file_report = read_errors + [
+        f"  ⚠️  {source}: {n} chunks (indexing failed)" if source in failed_sources
+        else f"  ✅ {source}: {n} chunks"
+        for source, n in file_chunks.items()
+    ]
+    if file_report:
+        print('\n'.join(file_report))
     
-    print(f"\n✨ Database built successfully!")
+    if failed_sources:
+        print(f"\n⚠️  Database built with errors: {len(failed_sources)} files not fully indexed")
+    else:
+        print(f"\n✨ Database built successfully!")
     print(f"📊 Total chunks indexed: {total_chunks}")
     print(f"💾 Saved to: {db_path}")
 
@@ -4,45 +4,131 @@
 
 import re
 
+# 预编译正则（模块级，避免每次调用查re缓存）
+_RE_NUMBER = re.compile(r'\d+')
+_RE_URL = re.compile(r'http|www\.')
+_RE_PROPER_NAME = re.compile(r'[A-Z][a-z]+\s+[A-Z][a-z]+')
+_RE_STEPS = (
+    re.compile(r'\d+\.'),  # 1. 2. 3.
+    re.compile(r'step \d+'),  # Step 1, Step 2
+    re.compile(r'first|second|third|then|next|finally'),  # 顺序词
+)
+_RE_STRUCTURE = re.compile(r'\n\s*[-•*]|\d+\.')
+_RE_RECOMMEND = re.compile(r'recommend|suggest|should|could try')
+_RE_OPTION = re.compile(r'\d+\)|option \d+')  # 'alternatively' 用 str.count 统计
+
+# 关键词组（模块级常量，避免每次调用重建列表）
+_VAGUE_TERMS = ('maybe', 'might', 'possibly', 'unclear', "i don't know")
+_CONNECTORS = ('first', 'then', 'next', 'after', 'finally', 'before')
+_ACTION_VERBS = ('click', 'go', 'visit', 'submit', 'fill', 'select', 'open', 'enter')
+_COMPARISON_WORDS = (
+    'compare', 'difference', 'similar', 'both', 'while', 
+    'whereas', 'however', 'in contrast', 'on the other hand'
+)
+_DIMENSIONS = ('cost', 'location', 'facility', 'time', 'quality', 'size', 'distance')
+_REASONING_WORDS = ('because', 'since', 'as', 'due to', 'offers', 'provides', 'has')
+_CONSTRAINT_WORDS = ('budget', 'time', 'location', 'prefer', 'near', 'available', 'suitable')
+
+# ----------------------------------------------------------------
+# 打分聚合：纯数值函数，只依赖特征计数，与文本扫描解耦
+# ----------------------------------------------------------------
+def _score_factual(length, has_number, has_url, has_specific_name, has_vague):
+    """返回 (length_score, specificity_score, clarity_score, total_score)"""
+    if length <= 150:
+        length_score = 1.0
+    elif length <= 300:
+        length_score = 0.8
+    else:
+        length_score = 0.5
+    
+    specificity_score = (
+        (0.4 if has_number else 0) +
+        (0.3 if has_url else 0) +
+        (0.3 if has_specific_name else 0)
+    )
+    clarity_score = 0.0 if has_vague else 1.0
+    
+    total_score = (
+        0.3 * length_score +
+        0.4 * specificity_score +
+        0.3 * clarity_score
+    )
+    return length_score, specificity_score, clarity_score, total_score
+
+def _score_procedural(step_markers, connector_count, action_count):
+    """返回 (step_score, logic_score, action_score, total_score)"""
+    # 至少3个步骤算基本完整
+    step_score = min(step_markers / 3.0, 1.0)
+    logic_score = min(connector_count / 3.0, 1.0)
+    action_score = min(action_count / 4.0, 1.0)
+    
+    total_score = (
+        0.4 * step_score +
+        0.3 * logic_score +
+        0.3 * action_score
+    )
+    return step_score, logic_score, action_score, total_score
+
+def _score_comparative(comparison_count, dimension_count, has_structure, length):
+    """返回 (comparison_score, dimension_score, structure_score, length_score, total_score)"""
+    comparison_score = min(comparison_count / 3.0, 1.0)
+    dimension_score = min(dimension_count / 2.0, 1.0)
+    structure_score = 1.0 if has_structure else 0.5
+    if length >= 200:
+        length_score = 1.0
+    elif length >= 100:
+        length_score = 0.7
+    else:
+        length_score = 0.4
+    
+    total_score = (
+        0.3 * comparison_score +
+        0.3 * dimension_score +
+        0.2 * structure_score +
+        0.2 * length_score
+    )
+    return comparison_score, dimension_score, structure_score, length_score, total_score
+
+def _score_recommendation(has_recommendation, reasoning_count, constraint_count, option_markers):
+    """返回 (recommendation_score, reasoning_score, constraint_score, diversity_score, total_score)"""
+    recommendation_score = 1.0 if has_recommendation else 0.0
+    reasoning_score = min(reasoning_count / 2.0, 1.0)
+    constraint_score = min(constraint_count / 2.0, 1.0)
+    diversity_score = min(option_markers / 2.0, 1.0)
+    
+    total_score = (
+        0.3 * recommendation_score +
+        0.3 * reasoning_score +
+        0.25 * constraint_score +
+        0.15 * diversity_score
+    )
+    return recommendation_score, reasoning_score, constraint_score, diversity_score, total_score
+
 class Evaluator:
     """统一评测器"""
     
     @staticmethod
     def evaluate_factual(answer: str):
         """事实定位型评测"""
+        return Evaluator._evaluate_factual(answer, answer.lower())
+    
+    @staticmethod
+    def _evaluate_factual(answer: str, answer_lower: str):
+        """事实定位型评测（answer_lower 由调用方预先计算）"""
         
-        answer_lower = answer.lower().strip()
-        
-        # 1. 长度评分（应该简洁）
+        # 1. 长度（应该简洁）
         length = len(answer)
-        if length <= 150:
-            length_score = 1.0
-        elif length <= 300:
-            length_score = 0.8
-        else:
-            length_score = 0.5
         
         # 2. 包含具体信息（数字、URL、地址等）
-        has_number = bool(re.search(r'\d+', answer))
-        has_url = bool(re.search(r'http|www\.', answer_lower))
-        has_specific_name = bool(re.search(r'[A-Z][a-z]+\s+[A-Z][a-z]+', answer))
-        
-        specificity_score = (
-            (0.4 if has_number else 0) +
-            (0.3 if has_url else 0) +
-            (0.3 if has_specific_name else 0)
-        )
+        has_number = bool(_RE_NUMBER.search(answer))
+        has_url = bool(_RE_URL.search(answer_lower))
+        has_specific_name = bool(_RE_PROPER_NAME.search(answer))
         
         # 3. 避免模糊回答
-        vague_terms = ['maybe', 'might', 'possibly', 'unclear', "i don't know"]
-        has_vague = any(term in answer_lower for term in vague_terms)
-        clarity_score = 0.0 if has_vague else 1.0
-        
-        # 总分
-        total_score = (
-            0.3 * length_score +
-            0.4 * specificity_score +
-            0.3 * clarity_score
+        has_vague = any(term in answer_lower for term in _VAGUE_TERMS)
+        
+        length_score, specificity_score, clarity_score, total_score = _score_factual(
+            length, has_number, has_url, has_specific_name, has_vague
         )
         
         return {
@@ -58,38 +144,25 @@ class Evaluator:
     @staticmethod
     def evaluate_procedural(answer: str):
         """过程解释型评测"""
-        
-        answer_lower = answer.lower()
+        return Evaluator._evaluate_procedural(answer, answer.lower())
+    
+    @staticmethod
+    def _evaluate_procedural(answer: str, answer_lower: str):
+        """过程解释型评测（answer_lower 由调用方预先计算）"""
         
         # 1. 步骤标记检测
-        step_patterns = [
-            r'\d+\.',  # 1. 2. 3.
-            r'step \d+',  # Step 1, Step 2
-            r'first|second|third|then|next|finally',  # 顺序词
-        ]
-        
         step_markers = 0
-        for pattern in step_patterns:
-            step_markers += len(re.findall(pattern, answer_lower))
-        
-        # 至少3个步骤算基本完整
-        step_score = min(step_markers / 3.0, 1.0)
+        for pattern in _RE_STEPS:
+            step_markers += len(pattern.findall(answer_lower))
         
         # 2. 逻辑连接词
-        connectors = ['first', 'then', 'next', 'after', 'finally', 'before']
-        connector_count = sum(1 for c in connectors if c in answer_lower)
-        logic_score = min(connector_count / 3.0, 1.0)
+        connector_count = sum(1 for c in _CONNECTORS if c in answer_lower)
         
         # 3. 动作词（表示操作步骤）
-        action_verbs = ['click', 'go', 'visit', 'submit', 'fill', 'select', 'open', 'enter']
-        action_count = sum(1 for v in action_verbs if v in answer_lower)
-        action_score = min(action_count / 4.0, 1.0)
-        
-        # 总分
-        total_score = (
-            0.4 * step_score +
-            0.3 * logic_score +
-            0.3 * action_score
+        action_count = sum(1 for v in _ACTION_VERBS if v in answer_lower)
+        
+        step_score, logic_score, action_score, total_score = _score_procedural(
+            step_markers, connector_count, action_count
         )
         
         return {
@@ -106,41 +179,27 @@ class Evaluator:
     @staticmethod
     def evaluate_comparative(answer: str):
         """比较分析型评测"""
-        
-        answer_lower = answer.lower()
+        return Evaluator._evaluate_comparative(answer, answer.lower())
+    
+    @staticmethod
+    def _evaluate_comparative(answer: str, answer_lower: str):
+        """比较分析型评测（answer_lower 由调用方预先计算）"""
         
         # 1. 对比词汇
-        comparison_words = [
-            'compare', 'difference', 'similar', 'both', 'while', 
-            'whereas', 'however', 'in contrast', 'on the other hand'
-        ]
-        comparison_count = sum(1 for w in comparison_words if w in answer_lower)
-        comparison_score = min(comparison_count / 3.0, 1.0)
+        comparison_count = sum(1 for w in _COMPARISON_WORDS if w in answer_lower)
         
         # 2. 多维度分析（至少提到2个对比维度）
-        dimensions = ['cost', 'location', 'facility', 'time', 'quality', 'size', 'distance']
-        dimension_count = sum(1 for d in dimensions if d in answer_lower)
-        dimension_score = min(dimension_count / 2.0, 1.0)
+        dimension_count = sum(1 for d in _DIMENSIONS if d in answer_lower)
         
         # 3. 结构化（是否分点讨论）
-        has_structure = bool(re.search(r'\n\s*[-•*]|\d+\.', answer))
-        structure_score = 1.0 if has_structure else 0.5
+        has_structure = bool(_RE_STRUCTURE.search(answer))
         
         # 4. 长度（比较型应该较详细）
         length = len(answer)
-        if length >= 200:
-            length_score = 1.0
-        elif length >= 100:
-            length_score = 0.7
-        else:
-            length_score = 0.4
-        
-        # 总分
-        total_score = (
-            0.3 * comparison_score +
-            0.3 * dimension_score +
-            0.2 * structure_score +
-            0.2 * length_score
+        
+        (comparison_score, dimension_score, structure_score,
+         length_score, total_score) = _score_comparative(
+            comparison_count, dimension_count, has_structure, length
         )
         
         return {
@@ -157,33 +216,30 @@ class Evaluator:
     @staticmethod
     def evaluate_recommendation(answer: str):
         """约束推荐型评测"""
-        
-        answer_lower = answer.lower()
+        return Evaluator._evaluate_recommendation(answer, answer.lower())
+    
+    @staticmethod
+    def _evaluate_recommendation(answer: str, answer_lower: str):
+        """约束推荐型评测（answer_lower 由调用方预先计算）"""
         
         # 1. 是否给出具体推荐
-        has_recommendation = bool(re.search(r'recommend|suggest|should|could try', answer_lower))
-        recommendation_score = 1.0 if has_recommendation else 0.0
+        has_recommendation = bool(_RE_RECOMMEND.search(answer_lower))
         
         # 2. 是否提供理由
-        reasoning_words = ['because', 'since', 'as', 'due to', 'offers', 'provides', 'has']
-        reasoning_count = sum(1 for w in reasoning_words if w in answer_lower)
-        reasoning_score = min(reasoning_count / 2.0, 1.0)
+        reasoning_count = sum(1 for w in _REASONING_WORDS if w in answer_lower)
         
         # 3. 是否考虑约束条件
-        constraint_words = ['budget', 'time', 'location', 'prefer', 'near', 'available', 'suitable']
-        constraint_count = sum(1 for w in constraint_words if w in answer_lower)
-        constraint_score = min(constraint_count / 2.0, 1.0)
+        constraint_count = sum(1 for w in _CONSTRAINT_WORDS if w in answer_lower)
         
         # 4. 是否提供多个选项
-        option_markers = len(re.findall(r'\d+\)|option \d+|alternatively', answer_lower))
-        diversity_score = min(option_markers / 2.0, 1.0)
-        
-        # 总分
-        total_score = (
-            0.3 * recommendation_score +
-            0.3 * reasoning_score +
-            0.25 * constraint_score +
-            0.15 * diversity_score
+        option_markers = (
+            len(_RE_OPTION.findall(answer_lower)) +
+            answer_lower.count('alternatively')
+        )
+        
+        (recommendation_score, reasoning_score, constraint_score,
+         diversity_score, total_score) = _score_recommendation(
+            has_recommendation, reasoning_count, constraint_count, option_markers
         )
         
         return {
@@ -202,14 +258,15 @@ class Evaluator:
     def evaluate(answer: str, question_type: str):
         """根据类型选择评测方法"""
         evaluators = {
-            'factual': Evaluator.evaluate_factual,
-            'procedural': Evaluator.evaluate_procedural,
-            'comparative': Evaluator.evaluate_comparative,
-            'recommendation': Evaluator.evaluate_recommendation
+            'factual': Evaluator._evaluate_factual,
+            'procedural': Evaluator._evaluate_procedural,
+            'comparative': Evaluator._evaluate_comparative,
+            'recommendation': Evaluator._evaluate_recommendation
         }
         
         evaluator = evaluators.get(question_type)
         if not evaluator:
             raise ValueError(f"Unknown question type: {question_type}")
         
-        return evaluator(answer)
+        # 小写只算一次，供各项特征共用
+        return evaluator(answer, answer.lower())
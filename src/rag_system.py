@@ -3,42 +3,77 @@ RAG系统核心
 """
 
 import chromadb
+from chromadb.utils import embedding_functions
 import requests
-import json
+import orjson
+from requests.adapters import HTTPAdapter
 
 class OllamaClient:
     """Ollama客户端"""
     
-    def __init__(self, base_url: str = "http://localhost:11434"):
+    def __init__(self, base_url: str = "http://localhost:11434",
+                 pool_connections: int = 4, pool_maxsize: int = 16):
         self.base_url = base_url
+        
+        # 复用keep-alive连接，避免每次请求重新建立TCP连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def generate(self, model: str, prompt: str, temperature: float = 0.7):
-        """生成回答"""
+        """生成回答（流式读取NDJSON，逐块拼接）"""
         try:
-            response = requests.post(
+            with self.session.post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": model,
                     "prompt": prompt,
                     "temperature": temperature,
-                    "stream": False
+                    "stream": True
                 },
-                timeout=300
-            )
+                timeout=300,
+                stream=True
+            ) as response:
+                
+                if response.status_code != 200:
+                    return {
+                        'success': False,
+                        'error': f"HTTP {response.status_code}",
+                        'model': model
+                    }
+                
+                parts = []
+                done = False
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    if 'error' in chunk:
+                        return {
+                            'success': False,
+                            'error': chunk['error'],
+                            'model': model
+                        }
+                    parts.append(chunk.get('response', ''))
+                    # 不提前break：读完流末尾的结束块，连接才能归还连接池复用
+                    if chunk.get('done'):
+                        done = True
             
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    'success': True,
-                    'response': result.get('response', ''),
-                    'model': model
-                }
-            else:
+            # 流在done之前结束（连接中断/服务端中止），回答不完整
+            if not done:
                 return {
                     'success': False,
-                    'error': f"HTTP {response.status_code}",
+                    'error': "Stream ended before generation finished",
                     'model': model
                 }
+            
+            return {
+                'success': True,
+                'response': ''.join(parts),
+                'model': model
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -58,24 +93,53 @@ class RAGSystem:
             raise Exception(f"❌ Database not found! Please run build_vector_db.py first")
         
         self.ollama = OllamaClient()
+        
+        # 与建库时一致的默认embedding（build_vector_db未指定embedding_function）
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        
+        # 检索结果缓存: (query, top_k) -> retrieved_docs
+        self._retrieve_cache = {}
+        # 问题向量缓存: query -> embedding
+        self._emb_cache = {}
     
     def retrieve(self, query: str, top_k: int = 5):
         """检索相关文档"""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k
-        )
-        
-        retrieved_docs = []
-        if results['documents'] and results['documents'][0]:
-            for i, doc in enumerate(results['documents'][0]):
-                retrieved_docs.append({
-                    'content': doc,
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i] if 'distances' in results else None
-                })
-        
-        return retrieved_docs
+        return self.retrieve_batch([query], top_k=top_k)[0]
+    
+    def retrieve_batch(self, queries: list, top_k: int = 5):
+        """批量检索：一次embedding前向 + 一次查询，返回与queries对齐的文档列表
+        
+        结果按 (query, top_k) 缓存，检索与模型无关，重复问题只检索一次。
+        """
+        missing = [q for q in dict.fromkeys(queries)
+                   if (q, top_k) not in self._retrieve_cache]
+        
+        if missing:
+            self.embed_queries(missing)
+            results = self.collection.query(
+                query_embeddings=[self._emb_cache[q] for q in missing],
+                n_results=top_k
+            )
+            
+            for q_idx, query in enumerate(missing):
+                retrieved_docs = []
+                if results['documents'] and results['documents'][q_idx]:
+                    for i, doc in enumerate(results['documents'][q_idx]):
+                        retrieved_docs.append({
+                            'content': doc,
+                            'metadata': results['metadatas'][q_idx][i],
+                            'distance': results['distances'][q_idx][i] if results.get('distances') else None
+                        })
+                self._retrieve_cache[(query, top_k)] = retrieved_docs
+        
+        return [self._retrieve_cache[(q, top_k)] for q in queries]
+    
+    def embed_queries(self, queries: list):
+        """对未缓存的问题去重后一次性批量embedding"""
+        unique = [q for q in dict.fromkeys(queries) if q not in self._emb_cache]
+        if unique:
+            embeddings = self.embedding_function(unique)
+            self._emb_cache.update(zip(unique, embeddings))
     
     def build_prompt(self, question: str, retrieved_docs: list, question_type: str):
         """根据问题类型构建prompt"""
@@ -107,11 +171,13 @@ Answer:"""
         
         return prompt
     
-    def query(self, question: str, model: str, question_type: str, top_k: int = 5):
-        """完整RAG查询"""
+    def query(self, question: str, model: str, question_type: str, top_k: int = 5,
+              retrieved_docs: list = None):
+        """完整RAG查询（可传入预先批量检索的retrieved_docs跳过检索）"""
         
         # 1. 检索
-        retrieved_docs = self.retrieve(question, top_k=top_k)
+        if retrieved_docs is None:
+            retrieved_docs = self.retrieve(question, top_k=top_k)
         
         # 2. 构建prompt
         prompt = self.build_prompt(question, retrieved_docs, question_type)
@@ -4,11 +4,12 @@
 """
 
 import sys
-import json
+import orjson
 import os
 from datetime import datetime
 from pathlib import Path
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor
 
 if sys.platform == 'win32':
     try:
@@ -68,8 +69,8 @@ def load_questions(questions_dir: str = "../questions"):
     for qtype in question_types:
         filepath = questions_path / f"{qtype}.txt"
         if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                questions = [line.strip() for line in f if line.strip()]
+            lines = filepath.read_text(encoding='utf-8').split('\n')
+            questions = [line.strip() for line in lines if line.strip()]
             all_questions[qtype] = questions
             print(f"✅ Loaded {len(questions)} {qtype} questions")
         else:
@@ -81,9 +82,13 @@ def load_questions(questions_dir: str = "../questions"):
     
     return all_questions
 
-def run_experiment(models: list, rag_system: RAGSystem, questions_dict: dict):
+def run_experiment(models: list, rag_system: RAGSystem, questions_dict: dict,
+                   max_workers: int = 4):
     """运行完整实验"""
     
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+    
     # 创建结果目录
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     results_dir = Path(f"../results/experiment_{timestamp}")
@@ -93,59 +98,76 @@ def run_experiment(models: list, rag_system: RAGSystem, questions_dict: dict):
     
     all_results = {}
     
-    for model in models:
-        print(f"\n{'='*80}")
-        print(f"🤖 Testing model: {model}")
-        print(f"{'='*80}")
-        
-        model_results = {}
-        
-        for qtype, questions in questions_dict.items():
-            if not questions:
-                continue
+    # 批量检索所有问题（与模型无关，只做一次）
+    flat = [(qtype, q) for qtype, questions in questions_dict.items() for q in questions]
+    flat_docs = rag_system.retrieve_batch([q for _, q in flat], top_k=5)
+    retrieved = dict(zip(flat, flat_docs))
+    
+    # 整个实验共用一个线程池：每个模型的全部问题一次性提交，
+    # 问题类型之间不再等待线程池排空，Ollama始终有max_workers个请求在处理
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for model in models:
+            print(f"\n{'='*80}")
+            print(f"🤖 Testing model: {model}")
+            print(f"{'='*80}")
             
-            print(f"\n📋 Question type: {qtype.upper()}")
+            model_results = {}
             
-            type_results = []
+            futures = {
+                qtype: [
+                    executor.submit(rag_system.query, q, model, qtype, top_k=5,
+                                    retrieved_docs=retrieved[(qtype, q)])
+                    for q in questions
+                ]
+                for qtype, questions in questions_dict.items()
+            }
             
-            for question in tqdm(questions, desc=f"  Processing"):
-                # RAG查询
-                result = rag_system.query(question, model, qtype, top_k=5)
+            for qtype, questions in questions_dict.items():
+                if not questions:
+                    continue
+                
+                print(f"\n📋 Question type: {qtype.upper()}")
+                
+                type_results = []
+                
+                # 按问题原有顺序收集结果
+                results = [f.result() for f in tqdm(futures[qtype], desc=f"  Processing",
+                                                  mininterval=0.5, leave=False)]
                 
-                if result['success']:
-                    # 评测
-                    evaluation = Evaluator.evaluate(result['answer'], qtype)
+                for question, result in zip(questions, results):
+                    if result['success']:
+                        # 评测
+                        evaluation = Evaluator.evaluate(result['answer'], qtype)
+                        
+                        # 合并结果
+                        full_result = {
+                            'question': question,
+                            'answer': result['answer'],
+                            'retrieved_docs_count': len(result['retrieved_docs']),
+                            'evaluation': evaluation
+                        }
+                        
+                        type_results.append(full_result)
+                    else:
+                        print(f"\n    ❌ Failed: {result.get('error', 'Unknown error')}")
+                
+                # 计算该类型平均分
+                if type_results:
+                    avg_score = sum(r['evaluation']['total_score'] for r in type_results) / len(type_results)
+                    print(f"  📊 Average score: {avg_score:.3f}")
                     
-                    # 合并结果
-                    full_result = {
-                        'question': question,
-                        'answer': result['answer'],
-                        'retrieved_docs_count': len(result['retrieved_docs']),
-                        'evaluation': evaluation
+                    model_results[qtype] = {
+                        'questions_count': len(type_results),
+                        'average_score': round(avg_score, 3),
+                        'details': type_results
                     }
-                    
-                    type_results.append(full_result)
-                else:
-                    print(f"\n    ❌ Failed: {result.get('error', 'Unknown error')}")
             
-            # 计算该类型平均分
-            if type_results:
-                avg_score = sum(r['evaluation']['total_score'] for r in type_results) / len(type_results)
-                print(f"  📊 Average score: {avg_score:.3f}")
-                
-                model_results[qtype] = {
-                    'questions_count': len(type_results),
-                    'average_score': round(avg_score, 3),
-                    'details': type_results
-                }
-        
-        all_results[model] = model_results
-        
-        # 保存单个模型结果
-        model_file = results_dir / f"{model.replace(':', '_')}.json"
-        with open(model_file, 'w', encoding='utf-8') as f:
-            json.dump(model_results, f, indent=2, ensure_ascii=False)
-        print(f"\n💾 Saved: {model_file.name}")
+            all_results[model] = model_results
+            
+            # 保存单个模型结果
+            model_file = results_dir / f"{model.replace(':', '_')}.json"
+            model_file.write_bytes(orjson.dumps(model_results, option=orjson.OPT_INDENT_2))
+            print(f"\n💾 Saved: {model_file.name}")
     
     # 生成汇总报告
     generate_summary(all_results, results_dir)
@@ -186,8 +208,7 @@ def generate_summary(all_results: dict, results_dir: Path):
     
     # 保存汇总
     summary_file = results_dir / "summary.json"
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    summary_file.write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
     
     print(f"\n💾 Summary saved to: {summary_file}")
     print(f"✨ Experiment completed!")
@@ -222,8 +243,12 @@ def main():
     
     print(f"\n🤖 Models to test: {', '.join(models)}")
     
-    # 4. 运行实验
-    run_experiment(models, rag_system, questions_dict)
+    # 4. 并发请求数（建议与Ollama服务端的 OLLAMA_NUM_PARALLEL 保持一致）
+    max_workers = 4
+    print(f"⚡ Concurrent requests: {max_workers}")
+    
+    # 5. 运行实验
+    run_experiment(models, rag_system, questions_dict, max_workers=max_workers)
 
 if __name__ == "__main__":
     main()
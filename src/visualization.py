@@ -1,7 +1,9 @@
 import os
 import json
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")  # headless backend: no GUI initialisation
+from matplotlib.figure import Figure
 
 # ----------------------------
 # 1) DATA — EDIT HERE IF NEEDED
@@ -35,23 +37,25 @@ gpt5_cat = {
 # -------------------------
 out_dir = os.path.join(".", "plot")
 os.makedirs(out_dir, exist_ok=True)
-saved_paths = []
 
 # --------------------------------------------
 # 3) HELPERS: BAR CHART & RADAR CHART DRAWERS
 # --------------------------------------------
+# Each helper builds its own Figure (no pyplot global state) and returns
+# the saved file path.
 def save_overall_bar(models, scores, title, outfile):
-    fig = plt.figure(figsize=(9, 5))
+    fig = Figure(figsize=(9, 5))
+    ax = fig.add_subplot(111)
     x = np.arange(len(models))
-    plt.bar(x, scores)
-    plt.xticks(x, models, rotation=20, ha="right")
-    plt.ylabel("Score")
-    plt.title(title)
-    plt.tight_layout()
+    ax.bar(x, scores)
+    ax.set_xticks(x)
+    ax.set_xticklabels(models, rotation=20, ha="right")
+    ax.set_ylabel("Score")
+    ax.set_title(title)
+    fig.tight_layout()
     fig_path = os.path.join(out_dir, outfile)
-    plt.savefig(fig_path, dpi=150)
-    plt.close()
-    saved_paths.append(fig_path)
+    fig.savefig(fig_path, dpi=150)
+    return fig_path
 
 def save_radar(models, categories, per_model_values, title, outfile):
     """
@@ -61,7 +65,7 @@ def save_radar(models, categories, per_model_values, title, outfile):
     angles = np.linspace(0, 2*np.pi, N, endpoint=False)
     angles = np.concatenate([angles, angles[:1]])  # close the loop
 
-    fig = plt.figure(figsize=(7, 7))
+    fig = Figure(figsize=(7, 7))
     ax = fig.add_subplot(111, polar=True)
     ax.set_theta_offset(np.pi / 2)  # start from top
     ax.set_theta_direction(-1)      # clockwise
@@ -80,13 +84,12 @@ def save_radar(models, categories, per_model_values, title, outfile):
         ax.plot(angles, vals, label=m)
         ax.fill(angles, vals, alpha=0.1)
 
-    plt.title(title)
-    plt.legend(loc="upper right", bbox_to_anchor=(1.25, 1.05))
-    plt.tight_layout()
+    ax.set_title(title)
+    ax.legend(loc="upper right", bbox_to_anchor=(1.25, 1.05))
+    fig.tight_layout()
     fig_path = os.path.join(out_dir, outfile)
-    plt.savefig(fig_path, dpi=150)
-    plt.close()
-    saved_paths.append(fig_path)
+    fig.savefig(fig_path, dpi=150)
+    return fig_path
 
 # ---------------------------------------------------
 # 4) CONVERT CATEGORY DICTS -> PER-MODEL VALUE TABLES
@@ -103,21 +106,20 @@ gpt5_per_model      = to_per_model_dict(models, categories, gpt5_cat)
 # -----------------------
 # 5) DRAW & SAVE FIGURES
 # -----------------------
-save_overall_bar(models, benchmark_overall,
-                 "Benchmark — Overall Weighted Scores by Model",
-                 "benchmark_overall_bar.png")
-
-save_overall_bar(models, gpt5_overall,
-                 "GPT-5 — Overall Weighted Scores by Model",
-                 "gpt5_overall_bar.png")
-
-save_radar(models, categories, benchmark_per_model,
-           "Benchmark — Category Scores (Radar)",
-           "benchmark_radar.png")
-
-save_radar(models, categories, gpt5_per_model,
-           "GPT-5 — Category Scores (Radar)",
-           "gpt5_radar.png")
+saved_paths = [
+    save_overall_bar(models, benchmark_overall,
+                     "Benchmark — Overall Weighted Scores by Model",
+                     "benchmark_overall_bar.png"),
+    save_overall_bar(models, gpt5_overall,
+                     "GPT-5 — Overall Weighted Scores by Model",
+                     "gpt5_overall_bar.png"),
+    save_radar(models, categories, benchmark_per_model,
+               "Benchmark — Category Scores (Radar)",
+               "benchmark_radar.png"),
+    save_radar(models, categories, gpt5_per_model,
+               "GPT-5 — Category Scores (Radar)",
+               "gpt5_radar.png"),
+]
 
 # -------------------------------------
 # 6) SAVE FILENAMES (TXT + JSON MANIFEST)